@@ -7,9 +7,13 @@ It provides functions to list, test, and analyze IOC devices.
 """
 
 import argparse
+import concurrent.futures
+import functools
+import re
 import subprocess
+import threading
 import time
-import yaml
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 import sys
 import os
@@ -17,12 +21,126 @@ import os
 # Add path for potential ophyd imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-try:
-    import epics
-    EPICS_AVAILABLE = True
-except ImportError:
-    EPICS_AVAILABLE = False
-    print("Warning: PyEPICS not available. Limited functionality.")
+# PyEPICS starts the CA library (and its threads) on import, so it is
+# imported by _epics() only when a command actually talks to an IOC.
+epics = None
+EPICS_AVAILABLE = None  # unknown until _epics() runs
+
+def _epics():
+    """Import PyEPICS on first use; return the module, or None if missing."""
+    global epics, EPICS_AVAILABLE
+    if EPICS_AVAILABLE is None:
+        try:
+            import epics as epics_module
+        except ImportError:
+            EPICS_AVAILABLE = False
+            print("Warning: PyEPICS not available. Limited functionality.")
+        else:
+            epics = epics_module
+            EPICS_AVAILABLE = True
+    return epics
+
+# PV base patterns that identify testable device types
+_DEVICE_KINDS = [
+    (re.compile(r':m\d+$'), 'motor'),
+    (re.compile(r':scaler\d+$'), 'scaler'),
+]
+
+def _device_kind(pv_base: str) -> Optional[str]:
+    """Return 'motor' or 'scaler' for a PV base, or None if unrecognized."""
+    for pattern, kind in _DEVICE_KINDS:
+        if pattern.search(pv_base):
+            return kind
+    return None
+
+# Fixed pieces of the inventory summary
+_RUNNING = "✅ Running"
+_NOT_RUNNING = "❌ Not running"
+_STATUS_TEMPLATE = "   adsim IOC: {adsim}\n   gp IOC:    {gp}"
+
+@dataclass(frozen=True, slots=True)
+class DeviceInfo:
+    """A discovered device: PV base, description and ophyd device type."""
+    pv: str
+    description: str
+    type: str
+    channels: Optional[int] = None  # scalers
+    dimensions: Optional[Tuple[int, int]] = None  # area detectors
+    
+    def as_dict(self) -> Dict:
+        """Return the flat dict form used in YAML output."""
+        info = {'pv': self.pv, 'description': self.description,
+                'type': self.type}
+        if self.channels is not None:
+            info['channels'] = self.channels
+        if self.dimensions is not None:
+            info['dimensions'] = list(self.dimensions)
+        return info
+
+@functools.lru_cache(maxsize=None)
+def _yaml_dumper():
+    """Import PyYAML on first use and return the dumper class to use."""
+    try:
+        from yaml import CSafeDumper as base  # libyaml, much faster
+    except ImportError:
+        from yaml import SafeDumper as base
+    
+    # Register on a private subclass so PyYAML's shared dumpers stay untouched
+    class _Dumper(base):
+        pass
+    
+    _Dumper.add_representer(
+        DeviceInfo, lambda rep, info: rep.represent_dict(info.as_dict())
+    )
+    # Array PVs read back as numpy values, which the safe dumpers reject;
+    # numpy is already loaded by PyEPICS whenever such values exist.
+    numpy = sys.modules.get('numpy')
+    if numpy is not None:
+        _Dumper.add_multi_representer(
+            numpy.ndarray, lambda rep, value: rep.represent_list(value.tolist())
+        )
+        _Dumper.add_multi_representer(
+            numpy.generic, lambda rep, value: rep.represent_data(value.item())
+        )
+    return _Dumper
+
+_DEVICE_LINE = "   - %s: %s"
+
+def _device_lines(devices) -> List[str]:
+    """Format one summary line per device."""
+    return [_DEVICE_LINE % (device.pv, device.description) for device in devices]
+
+# Known devices of the demo IOCs, built once at import.
+_DETECTORS = {
+    # Scalers from GP IOC: scaler1, scaler2, scaler3
+    'scalers': tuple(
+        DeviceInfo(f"gp:scaler{i}", f"Scaler {i}", 'ScalerCH', channels=32)
+        for i in range(1, 4)
+    ),
+    # Area detector from adsim IOC
+    'area_detectors': (
+        DeviceInfo('adsim:', 'Simulated Area Detector', 'ADBSoftDetector',
+                   dimensions=(1024, 1024)),
+    ),
+}
+
+_SUPPORT_DEVICES = {
+    # User calculations: userCalc1-10
+    'calculations': tuple(
+        DeviceInfo(f"gp:userCalc{i}", f"User Calculation {i}", 'EpicsSignal')
+        for i in range(1, 11)
+    ),
+    # User transforms: userTran1-10
+    'transforms': tuple(
+        DeviceInfo(f"gp:userTran{i}", f"User Transform {i}", 'EpicsSignal')
+        for i in range(1, 11)
+    ),
+    # IOC statistics
+    'statistics': (
+        DeviceInfo('gp:IOC_CPU_LOAD', 'IOC CPU Load', 'EpicsSignalRO'),
+        DeviceInfo('gp:IOC_MEM_USED', 'IOC Memory Usage', 'EpicsSignalRO'),
+    ),
+}
 
 class IOCExplorer:
     """Explores EPICS IOCs and categorizes devices for BITS configuration."""
@@ -30,28 +148,85 @@ class IOCExplorer:
     def __init__(self):
         self.demo_prefixes = ['gp:', 'adsim:']  # Tutorial IOC prefixes
         self.timeout = 5.0  # PV connection timeout
+        self._pv_cache = {}  # PV name -> epics.PV, reused across methods
+        self._podman_states = None  # podman's container states, fetched once
         
-    def check_ioc_status(self) -> Dict[str, bool]:
-        """Check if demo IOCs are running."""
-        result = {}
-        try:
-            # Check if containers are running
-            cmd = "podman ps --format '{{.Names}}' | grep -E '(adsim_ioc|gp_ioc)'"
-            output = subprocess.check_output(cmd, shell=True, text=True)
-            containers = output.strip().split('\n') if output.strip() else []
-            
-            result['adsim_ioc'] = 'adsim_ioc' in containers
-            result['gp_ioc'] = 'gp_ioc' in containers
-            
-        except subprocess.CalledProcessError:
-            result['adsim_ioc'] = False
-            result['gp_ioc'] = False
-            
-        return result
+    def _container_states(self, refresh: bool = False) -> Dict[bytes, bytes]:
+        """Map each demo container podman knows to its state, e.g. b"running"."""
+        if self._podman_states is None or refresh:
+            self._podman_states = {}
+            try:
+                # Inspect just our containers (no shell, no full listing).
+                # Missing containers are reported on stderr; the others still
+                # show up on stdout, so the exit code is not checked.
+                proc = subprocess.run(
+                    ['podman', 'container', 'inspect',
+                     '--format', '{{.Name}}={{.State.Status}}',
+                     'adsim_ioc', 'gp_ioc'],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False
+                )
+                # Split the raw b"name=status" lines; nothing needs decoding
+                self._podman_states = dict(
+                    line.partition(b"=")[::2] for line in proc.stdout.splitlines()
+                )
+            except OSError:
+                pass  # podman not installed
+        return self._podman_states
+    
+    def check_ioc_status(self, refresh: bool = False) -> Dict[str, bool]:
+        """Check if demo IOCs are running (cached unless refresh=True)."""
+        states = self._container_states(refresh)
+        return {name: states.get(name.encode()) == b"running"
+                for name in ('adsim_ioc', 'gp_ioc')}
+    
+    def _pv(self, pv_name: str):
+        """Return the cached epics.PV for this name, creating it once."""
+        pv = self._pv_cache.get(pv_name)
+        if pv is None:
+            pv = self._pv_cache[pv_name] = epics.PV(pv_name)
+        return pv
+    
+    def _wait_connected(self, pvs: List, timeout: float) -> bool:
+        """Wait for several PVs to connect, sharing one timeout."""
+        pending = [pv for pv in pvs if not pv.connected]
+        deadline = time.monotonic() + timeout
+        while pending and time.monotonic() < deadline:
+            epics.ca.poll(evt=0.01)
+            pending = [pv for pv in pending if not pv.connected]
+        return not pending
+    
+    def _probe(self, pv, timeout: float) -> Tuple[bool, object]:
+        """Wait for a PV to connect and read it; return (connected, value)."""
+        if not pv.wait_for_connection(timeout=timeout):
+            return False, None
+        return True, pv.get()
+    
+    def _probe_many(self, pv_names: List[str], timeout: float) -> Dict[str, object]:
+        """Probe PVs in parallel; map each name to its result or exception.
+        
+        An error reading one PV is recorded against that PV only; just
+        KeyboardInterrupt and SystemExit propagate.
+        """
+        pvs = {name: self._pv(name) for name in pv_names}
+        results = {}
+        # pyepics waits block, so overlap them in threads sharing one CA context
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(32, len(pvs)),
+                initializer=epics.ca.use_initial_context) as executor:
+            futures = {
+                executor.submit(self._probe, pv, timeout): name
+                for name, pv in pvs.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = e
+        return results
     
     def test_connectivity(self) -> bool:
         """Test basic EPICS connectivity to demo IOCs."""
-        if not EPICS_AVAILABLE:
+        if _epics() is None:
             print("❌ PyEPICS not available - cannot test connectivity")
             return False
             
@@ -59,16 +234,16 @@ class IOCExplorer:
         connected = 0
         
         print("Testing PV connectivity...")
+        results = self._probe_many(test_pvs, self.timeout)
         for pv_name in test_pvs:
-            try:
-                pv = epics.PV(pv_name)
-                if pv.wait_for_connection(timeout=self.timeout):
-                    print(f"✅ {pv_name}: {pv.get()}")
-                    connected += 1
-                else:
-                    print(f"❌ {pv_name}: Connection failed")
-            except Exception as e:
-                print(f"❌ {pv_name}: Error - {e}")
+            result = results[pv_name]
+            if isinstance(result, Exception):
+                print(f"❌ {pv_name}: Error - {result}")
+            elif result[0]:
+                print(f"✅ {pv_name}: {result[1]}")
+                connected += 1
+            else:
+                print(f"❌ {pv_name}: Connection failed")
                 
         success = connected == len(test_pvs)
         if success:
@@ -78,108 +253,51 @@ class IOCExplorer:
             
         return success
     
-    def find_motors(self) -> List[Dict[str, str]]:
+    def find_motors(self) -> List[DeviceInfo]:
         """Find motor devices in IOCs."""
         motors = []
-        
-        # GP IOC motors (m1-m20)
-        for i in range(1, 21):
-            pv_base = f"gp:m{i}"
-            
-            if EPICS_AVAILABLE:
-                try:
-                    desc_pv = epics.PV(f"{pv_base}.DESC")
-                    if desc_pv.wait_for_connection(timeout=1.0):
-                        desc = desc_pv.get()
-                        motors.append({
-                            'pv': pv_base,
-                            'description': desc or f"Motor {i}",
-                            'type': 'EpicsMotor'
-                        })
-                except:
-                    pass
-            else:
-                # Add expected motors for demo
-                motors.append({
-                    'pv': pv_base,
-                    'description': f"Motor {i}",
-                    'type': 'EpicsMotor'
-                })
-        
+
+        if _epics() is None:
+            # Add expected motors for demo (GP IOC motors m1-m20)
+            for i in range(1, 21):
+                motors.append(DeviceInfo(f"gp:m{i}", f"Motor {i}", 'EpicsMotor'))
+            return motors
+
+        # podman has the gp IOC container but it is stopped: skip twenty
+        # searches that would all time out. If podman is missing or does
+        # not know the container, the IOC may run elsewhere, so search.
+        if self._container_states().get(b'gp_ioc') not in (None, b"running"):
+            return motors
+
+        # Fetch every DESC in one bulk request: caget_many issues all the
+        # searches, waits once, then gets the connected ones together.
+        pvlist = [f"gp:m{i}.DESC" for i in range(1, 21)]
+        descs = epics.caget_many(pvlist, timeout=self.timeout,
+                                 conn_timeout=self.timeout)
+        for i, desc in zip(range(1, 21), descs):
+            if desc is None:  # not connected
+                continue
+            motors.append(
+                DeviceInfo(f"gp:m{i}", desc or f"Motor {i}", 'EpicsMotor')
+            )
+
         return motors
     
-    def find_detectors(self) -> Dict[str, List[Dict[str, str]]]:
+    def find_detectors(self) -> Dict[str, List[DeviceInfo]]:
         """Find detector devices in IOCs."""
-        detectors = {
-            'scalers': [],
-            'area_detectors': []
-        }
-        
-        # Scalers from GP IOC
-        for i in range(1, 4):  # scaler1, scaler2, scaler3
-            scaler_pv = f"gp:scaler{i}"
-            detectors['scalers'].append({
-                'pv': scaler_pv,
-                'description': f"Scaler {i}",
-                'type': 'ScalerCH',
-                'channels': 32
-            })
-        
-        # Area detector from adsim IOC
-        detectors['area_detectors'].append({
-            'pv': 'adsim:',
-            'description': 'Simulated Area Detector',
-            'type': 'ADBSoftDetector',
-            'dimensions': [1024, 1024]
-        })
-        
-        return detectors
+        # Fresh lists holding the shared, frozen records
+        return {category: list(devices) for category, devices in _DETECTORS.items()}
     
-    def find_support_devices(self) -> Dict[str, List[Dict[str, str]]]:
+    def find_support_devices(self) -> Dict[str, List[DeviceInfo]]:
         """Find support devices like calculations, transforms."""
-        support = {
-            'calculations': [],
-            'transforms': [],
-            'statistics': []
-        }
-        
-        # User calculations
-        for i in range(1, 11):  # userCalc1-10
-            support['calculations'].append({
-                'pv': f"gp:userCalc{i}",
-                'description': f"User Calculation {i}",
-                'type': 'EpicsSignal'
-            })
-        
-        # User transforms  
-        for i in range(1, 11):  # userTran1-10
-            support['transforms'].append({
-                'pv': f"gp:userTran{i}",
-                'description': f"User Transform {i}",
-                'type': 'EpicsSignal'
-            })
-        
-        # IOC statistics
-        support['statistics'].extend([
-            {
-                'pv': 'gp:IOC_CPU_LOAD',
-                'description': 'IOC CPU Load',
-                'type': 'EpicsSignalRO'
-            },
-            {
-                'pv': 'gp:IOC_MEM_USED',
-                'description': 'IOC Memory Usage', 
-                'type': 'EpicsSignalRO'
-            }
-        ])
-        
-        return support
+        # Fresh lists holding the shared, frozen records
+        return {category: list(devices) for category, devices in _SUPPORT_DEVICES.items()}
     
     def analyze_device(self, pv_base: str) -> Dict:
         """Analyze a specific device and return its properties."""
         info = {'pv': pv_base, 'connected': False, 'properties': {}}
         
-        if not EPICS_AVAILABLE:
+        if _epics() is None:
             info['error'] = 'PyEPICS not available'
             return info
             
@@ -187,10 +305,11 @@ class IOCExplorer:
             # Determine device type and relevant PVs to check
             test_pvs = []
             
-            if 'm' in pv_base and any(pv_base.startswith(p) for p in ['gp:', 'adsim:']):
+            kind = _device_kind(pv_base)
+            if kind == 'motor':
                 # Motor device
                 test_pvs = ['.RBV', '.VAL', '.DESC', '.EGU', '.HLM', '.LLM']
-            elif 'scaler' in pv_base:
+            elif kind == 'scaler':
                 # Scaler device
                 test_pvs = ['.CNT', '.T', '.S1', '.S2', '.DESC']
             elif 'adsim:' in pv_base:
@@ -200,17 +319,15 @@ class IOCExplorer:
                 # Generic device
                 test_pvs = ['.VAL', '.DESC']
             
-            # Test connections and get values
+            # Test connections and get values (all suffixes at once)
+            results = self._probe_many([pv_base + s for s in test_pvs], 2.0)
             for suffix in test_pvs:
-                full_pv = pv_base + suffix
-                try:
-                    pv = epics.PV(full_pv)
-                    if pv.wait_for_connection(timeout=2.0):
-                        value = pv.get()
-                        info['properties'][suffix] = value
-                        info['connected'] = True
-                except:
+                result = results[pv_base + suffix]
+                if isinstance(result, Exception):
                     info['properties'][suffix] = 'Connection failed'
+                elif result[0]:
+                    info['properties'][suffix] = result[1]
+                    info['connected'] = True
                     
         except Exception as e:
             info['error'] = str(e)
@@ -219,21 +336,20 @@ class IOCExplorer:
     
     def test_device_motion(self, motor_pv: str, relative_move: float = 0.1) -> bool:
         """Test motor motion (small relative move)."""
-        if not EPICS_AVAILABLE:
+        if _epics() is None:
             print("PyEPICS not available for motion testing")
             return False
             
         try:
             # Get current position
-            pos_pv = epics.PV(f"{motor_pv}.RBV")
+            pos_pv = self._pv(f"{motor_pv}.RBV")
             if not pos_pv.wait_for_connection(timeout=2.0):
                 print(f"❌ Cannot connect to {motor_pv}")
                 return False
                 
             initial_pos = pos_pv.get()
             
-            # Move relative
-            move_pv = epics.PV(f"{motor_pv}.RBV")  # Use relative move
+            # Plan a relative move from the position just read
             target = initial_pos + relative_move
             
             print(f"Moving {motor_pv} from {initial_pos:.3f} to {target:.3f}")
@@ -249,31 +365,46 @@ class IOCExplorer:
     
     def test_scaler_count(self, scaler_pv: str, count_time: float = 1.0) -> bool:
         """Test scaler counting."""
-        if not EPICS_AVAILABLE:
+        if _epics() is None:
             print("PyEPICS not available for scaler testing")
             return False
             
         try:
-            # Set count time
-            time_pv = epics.PV(f"{scaler_pv}.T")
-            count_pv = epics.PV(f"{scaler_pv}.CNT")
-            
-            if not (time_pv.wait_for_connection(timeout=2.0) and 
-                   count_pv.wait_for_connection(timeout=2.0)):
+            # Connect .T, .CNT and .S1 together rather than one after another
+            time_pv, count_pv, s1_pv = (
+                self._pv(f"{scaler_pv}.{field}") for field in ('T', 'CNT', 'S1')
+            )
+            self._wait_connected([time_pv, count_pv, s1_pv], timeout=2.0)
+            if not (time_pv.connected and count_pv.connected):
                 print(f"❌ Cannot connect to {scaler_pv}")
                 return False
                 
             # Set time and start count
             time_pv.put(count_time)
             print(f"Counting {scaler_pv} for {count_time} seconds...")
-            count_pv.put(1)  # Start count
+            # Wait for .CNT to drop back to 0 rather than sleeping a fixed time.
+            # A 0 only counts once a 1 has been seen: the initial monitor
+            # (the 0 from before this count) may arrive after the put.
+            started = threading.Event()
+            done = threading.Event()
             
-            # Wait for completion
-            time.sleep(count_time + 0.5)
+            def on_count(value=None, **kws):
+                if value == 1:
+                    started.set()
+                elif value == 0 and started.is_set():
+                    done.set()
+                    
+            cb_index = count_pv.add_callback(on_count)
+            try:
+                count_pv.put(1)  # Start count
+                if not done.wait(timeout=count_time + 2.0):
+                    print(f"❌ {scaler_pv} did not finish counting")
+                    return False
+            finally:
+                count_pv.remove_callback(cb_index)
             
             # Read results
-            s1_pv = epics.PV(f"{scaler_pv}.S1")
-            if s1_pv.wait_for_connection(timeout=1.0):
+            if s1_pv.connected:
                 counts = s1_pv.get()
                 print(f"✅ Channel 1 counts: {counts}")
                 return True
@@ -299,31 +430,45 @@ class IOCExplorer:
     
     def print_inventory_summary(self, inventory: Dict):
         """Print a human-readable summary of the inventory."""
+        lines = []
         status = inventory['ioc_status']
-        print(f"\n📊 IOC Status (as of {inventory['timestamp']}):")
-        print(f"   adsim IOC: {'✅ Running' if status['adsim_ioc'] else '❌ Not running'}")
-        print(f"   gp IOC:    {'✅ Running' if status['gp_ioc'] else '❌ Not running'}")
+        lines.append(f"\n📊 IOC Status (as of {inventory['timestamp']}):")
+        lines.append(_STATUS_TEMPLATE.format(
+            adsim=_RUNNING if status['adsim_ioc'] else _NOT_RUNNING,
+            gp=_RUNNING if status['gp_ioc'] else _NOT_RUNNING
+        ))
         
-        print(f"\n🔧 Motors Found: {len(inventory['motors'])}")
-        for motor in inventory['motors'][:3]:  # Show first 3
-            print(f"   - {motor['pv']}: {motor['description']}")
+        lines.append(f"\n🔧 Motors Found: {len(inventory['motors'])}")
+        lines.extend(_device_lines(inventory['motors'][:3]))  # Show first 3
         if len(inventory['motors']) > 3:
-            print(f"   ... and {len(inventory['motors']) - 3} more")
+            lines.append(f"   ... and {len(inventory['motors']) - 3} more")
             
         detectors = inventory['detectors']
-        print(f"\n🔍 Detectors Found:")
-        print(f"   Scalers: {len(detectors['scalers'])}")
-        for scaler in detectors['scalers']:
-            print(f"   - {scaler['pv']}: {scaler['description']}")
-        print(f"   Area Detectors: {len(detectors['area_detectors'])}")
-        for det in detectors['area_detectors']:
-            print(f"   - {det['pv']}: {det['description']}")
+        lines.append("\n🔍 Detectors Found:")
+        lines.append(f"   Scalers: {len(detectors['scalers'])}")
+        lines.extend(_device_lines(detectors['scalers']))
+        lines.append(f"   Area Detectors: {len(detectors['area_detectors'])}")
+        lines.extend(_device_lines(detectors['area_detectors']))
             
         support = inventory['support']
-        print(f"\n⚙️  Support Devices:")
-        print(f"   Calculations: {len(support['calculations'])}")
-        print(f"   Transforms:   {len(support['transforms'])}")
-        print(f"   Statistics:   {len(support['statistics'])}")
+        lines.append("\n⚙️  Support Devices:")
+        lines.append(f"   Calculations: {len(support['calculations'])}")
+        lines.append(f"   Transforms:   {len(support['transforms'])}")
+        lines.append(f"   Statistics:   {len(support['statistics'])}")
+        
+        _write_lines(lines)
+
+def _write_lines(lines: List[str]):
+    """Write lines to stdout with a single write instead of one print() each."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+def _write_yaml(data: Dict):
+    """Stream data to stdout as YAML, without building the whole string."""
+    import yaml
+    yaml.dump(data, sys.stdout, Dumper=_yaml_dumper(), default_flow_style=False)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
 
 def main():
     parser = argparse.ArgumentParser(
@@ -373,65 +518,69 @@ def main():
     if args.find_motors:
         motors = explorer.find_motors()
         if args.output_yaml:
-            print(yaml.dump({'motors': motors}, default_flow_style=False))
+            _write_yaml({'motors': motors})
         else:
-            print(f"\n🔧 Found {len(motors)} motors:")
-            for motor in motors:
-                print(f"   - {motor['pv']}: {motor['description']}")
+            lines = [f"\n🔧 Found {len(motors)} motors:"]
+            lines.extend(_device_lines(motors))
+            _write_lines(lines)
     
     if args.find_detectors:
         detectors = explorer.find_detectors()
         if args.output_yaml:
-            print(yaml.dump({'detectors': detectors}, default_flow_style=False))
+            _write_yaml({'detectors': detectors})
         else:
-            print(f"\n🔍 Found detectors:")
-            print(f"   Scalers ({len(detectors['scalers'])}):")
-            for det in detectors['scalers']:
-                print(f"   - {det['pv']}: {det['description']}")
-            print(f"   Area Detectors ({len(detectors['area_detectors'])}):")
-            for det in detectors['area_detectors']:
-                print(f"   - {det['pv']}: {det['description']}")
+            lines = ["\n🔍 Found detectors:"]
+            lines.append(f"   Scalers ({len(detectors['scalers'])}):")
+            lines.extend(_device_lines(detectors['scalers']))
+            lines.append(f"   Area Detectors ({len(detectors['area_detectors'])}):")
+            lines.extend(_device_lines(detectors['area_detectors']))
+            _write_lines(lines)
     
     if args.find_support:
         support = explorer.find_support_devices()
         if args.output_yaml:
-            print(yaml.dump({'support': support}, default_flow_style=False))
+            _write_yaml({'support': support})
         else:
-            print(f"\n⚙️  Support devices:")
+            lines = ["\n⚙️  Support devices:"]
             for category, devices in support.items():
-                print(f"   {category.title()} ({len(devices)}):")
-                for device in devices[:3]:  # Show first 3
-                    print(f"   - {device['pv']}: {device['description']}")
+                lines.append(f"   {category.title()} ({len(devices)}):")
+                lines.extend(_device_lines(devices[:3]))  # Show first 3
                 if len(devices) > 3:
-                    print(f"   ... and {len(devices) - 3} more")
+                    lines.append(f"   ... and {len(devices) - 3} more")
+            _write_lines(lines)
     
     if args.analyze_device:
         info = explorer.analyze_device(args.analyze_device)
         if args.output_yaml:
-            print(yaml.dump({'device_analysis': info}, default_flow_style=False))
+            _write_yaml({'device_analysis': info})
         else:
-            print(f"\n🔍 Device Analysis: {info['pv']}")
-            print(f"   Connected: {'✅' if info['connected'] else '❌'}")
+            lines = [f"\n🔍 Device Analysis: {info['pv']}"]
+            lines.append(f"   Connected: {'✅' if info['connected'] else '❌'}")
             if info['connected']:
-                print("   Properties:")
+                lines.append("   Properties:")
                 for prop, value in info['properties'].items():
-                    print(f"     {prop}: {value}")
+                    lines.append(f"     {prop}: {value}")
             if 'error' in info:
-                print(f"   Error: {info['error']}")
+                lines.append(f"   Error: {info['error']}")
+            _write_lines(lines)
     
     if args.test_device:
         device_pv = args.test_device
-        if 'm' in device_pv:  # Motor
-            explorer.test_device_motion(device_pv, args.move_relative)
-        elif 'scaler' in device_pv:  # Scaler
-            explorer.test_scaler_count(device_pv, args.count)
+        device_tests = {
+            'motor': (explorer.test_device_motion, args.move_relative),
+            'scaler': (explorer.test_scaler_count, args.count),
+        }
+        kind = _device_kind(device_pv)
+        if kind in device_tests:
+            test, test_arg = device_tests[kind]
+            test(device_pv, test_arg)
         else:
             print(f"❌ Don't know how to test device type: {device_pv}")
     
     if args.generate_inventory:
         inventory = explorer.generate_inventory()
         if args.output_yaml:
-            print(yaml.dump(inventory, default_flow_style=False))
+            _write_yaml(inventory)
         else:
             explorer.print_inventory_summary(inventory)
 